@@ -1,28 +1,97 @@
 import re
 import csv
 import sys
-import json
 import time
+import heapq
 import fnmatch
+import functools
 import logging
+import orjson
 import argparse
 import requests
+import threading
 
+from contextlib import nullcontext
 from collections import deque
-from bs4 import BeautifulSoup
-from typing import Set, Dict, List, Optional
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from urllib3.util.retry import Retry
+from requests.adapters import HTTPAdapter
+from typing import Set, Dict, List, Optional, Tuple, FrozenSet
 from urllib.robotparser import RobotFileParser
-from urllib.parse import urlparse, urljoin, urlunparse
+from selectolax.lexbor import LexborHTMLParser
+from urllib.parse import urlparse, urljoin
+
+# URLs are parsed repeatedly across filtering, robots and rate limiting checks
+_urlparse = functools.lru_cache(maxsize=100_000)(urlparse)
+
+# Charset parameter of a Content-Type header
+_CHARSET_RE = re.compile(r'charset\s*=\s*["\']?([\w.:-]+)', re.IGNORECASE)
+
+
+# Leading global inline flags such as (?i), already folded into Pattern.flags
+_GLOBAL_FLAGS_RE = re.compile(r'\A(?:\(\?[aiLmsux]+\))+')
+
+# Flags that can be re-applied to one pattern as a scoped (?flags:...) group
+_SCOPED_FLAGS = ((re.ASCII, 'a'), (re.IGNORECASE, 'i'), (re.LOCALE, 'L'),
+                 (re.MULTILINE, 'm'), (re.DOTALL, 's'), (re.VERBOSE, 'x'))
+
+
+def _compile_patterns(patterns) -> List[re.Pattern]:
+    """Compile URL filter patterns, combining them into one alternation when it is safe"""
+    compiled = [re.compile(p) for p in (patterns or [])]
+    if len(compiled) < 2:
+        return compiled
+    
+    # Groups would be renumbered (or names duplicated) once patterns are joined,
+    # breaking backreferences, so such lists are matched pattern by pattern
+    if any(p.groups for p in compiled):
+        return compiled
+    
+    sources = []
+    for p in compiled:
+        source = _GLOBAL_FLAGS_RE.sub('', p.pattern)
+        flags = ''.join(letter for flag, letter in _SCOPED_FLAGS if p.flags & flag)
+        if p.flags & re.VERBOSE:
+            source += '\n'  # End any trailing comment before the group closes
+        sources.append(f"(?{flags}:{source})")
+    
+    return [re.compile('|'.join(sources))]
+
+
+@functools.lru_cache(maxsize=4096)
+def _format_timestamp(timestamp: int) -> str:
+    """Format epoch seconds for output, reusing strings for pages scraped in the same second"""
+    return time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(timestamp))
+
+
+def _exported(item: Dict) -> Dict:
+    """Copy of scraped page data with its timestamp formatted for output"""
+    return {**item, 'timestamp': _format_timestamp(item['timestamp'])}
 
 
 class WebScraper:
+    # Failed or missing robots.txt lookups are retried sooner than real ones
+    ROBOTS_NEGATIVE_TTL = 10 * 60
+    # Only the first 500 KB of robots.txt is honoured (matches Googlebot)
+    ROBOTS_MAX_BYTES = 500 * 1024
+    # Pages larger than this are skipped without being parsed
+    MAX_PAGE_BYTES = 5 * 1024 * 1024
+    # Page requests ask for HTML so servers can avoid sending other content
+    PAGE_HEADERS = {'Accept': 'text/html,application/xhtml+xml;q=0.9,*/*;q=0.1'}
+    # Flattened per-page fields, kept as columns for summaries and CSV output
+    CSV_FIELDS = ('url', 'domain', 'title', 'meta_description', 'meta_keywords',
+                  'text_length', 'status_code', 'timestamp', 'num_links', 'num_images',
+                  'h1_count', 'h2_count', 'h3_count', 'h1_text')
+
     def __init__(self, start_url: str, allow_exit: bool = False, 
                  external_links_depth: int = 0, max_depth: int = 3,
                  delay: float = 1.0, output_format: str = 'json',
                  verbose: bool = False, headers: Optional[Dict] = None,
                  exclude_patterns: Optional[List[str]] = None,
                  include_patterns: Optional[List[str]] = None,
-                 respect_robots: bool = True, user_agent: str = '*'):
+                 respect_robots: bool = True, user_agent: str = '*',
+                 max_workers: int = 16, robots_ttl: float = 6 * 3600,
+                 stream_file: Optional[str] = None):
         
         # Core configuration
         self.start_url = start_url
@@ -34,25 +103,47 @@ class WebScraper:
         self.verbose = verbose
         self.respect_robots = respect_robots
         self.user_agent = user_agent
+        self.max_workers = max_workers
+        self.stream_file = stream_file  # NDJSON file written incrementally during crawl
         
         # Default headers if none provided
         self.headers = headers or {
             'User-Agent': 'Mozilla/5.0 (compatible; WebScraper/1.0; +http://example.com/bot)'
         }
         
+        # Shared HTTP session for connection pooling and keep-alive
+        self.session = requests.Session()
+        self.session.headers.update(self.headers)
+        # Only retry gateway errors: timeouts and connection errors fail at once so
+        # the request timeouts stay the real bound. 429 is left to crawl(), and
+        # Retry-After is ignored so a server cannot pin a worker for an unbounded time
+        retries = Retry(total=2, connect=0, read=0, backoff_factor=0.3,
+                        status_forcelist=[502, 503, 504],
+                        respect_retry_after_header=False,
+                        raise_on_status=False)
+        adapter = HTTPAdapter(pool_connections=32, pool_maxsize=64, max_retries=retries)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+        
         # Compile regex patterns for URL filtering
-        self.exclude_patterns = [re.compile(p) for p in (exclude_patterns or [])]
-        self.include_patterns = [re.compile(p) for p in (include_patterns or [])]
+        self.exclude_patterns = _compile_patterns(exclude_patterns)
+        self.include_patterns = _compile_patterns(include_patterns)
         
         # Domain tracking
-        self.start_domain = urlparse(start_url).netloc
+        self.start_domain = _urlparse(start_url).netloc
         self.visited_urls: Set[str] = set()
+        self._enqueued: Set[str] = {self.start_url}  # Every URL ever added to the crawl queue
         self.scraped_data: List[Dict] = []
+        self._columns: Dict[str, List] = {field: [] for field in self.CSV_FIELDS}
+        self._stream = None
         self.max_external_hops = 0
-        self.current_domains: Set[str] = {self.start_domain}
+        # Replaced rather than mutated, so workers always read a consistent snapshot
+        self.current_domains: FrozenSet[str] = frozenset({self.start_domain})
         
         # Robots.txt caching and rate limiting
-        self.robots_cache: Dict[str, RobotFileParser] = {}
+        self.robots_ttl = robots_ttl
+        self.robots_cache: Dict[str, Tuple[Optional[RobotFileParser], float]] = {}
+        self._robots_locks: Dict[str, threading.Lock] = {}  # One fetch per domain at a time
         self.domain_delays: Dict[str, float] = {}
         
         # Logging setup
@@ -69,40 +160,70 @@ class WebScraper:
         if not self.respect_robots:
             return None
             
-        if domain in self.robots_cache:
-            return self.robots_cache[domain]
-        
+        # Serve cached parser while it is fresh
+        cached = self._fresh_robots_entry(domain)
+        if cached is not None:
+            return cached[0]
+        
+        # Workers meeting the same domain wait for a single fetch
+        with self._robots_locks.setdefault(domain, threading.Lock()):
+            cached = self._fresh_robots_entry(domain)
+            if cached is not None:
+                return cached[0]
+            return self._fetch_robots_parser(domain)
+
+
+    def _fresh_robots_entry(self, domain: str) -> Optional[Tuple[Optional[RobotFileParser], float]]:
+        """Return the cached robots.txt entry for a domain if it has not expired"""
+        cached = self.robots_cache.get(domain)
+        if cached is not None:
+            rp, fetched_at = cached
+            ttl = self.robots_ttl if rp is not None else self.ROBOTS_NEGATIVE_TTL
+            if time.monotonic() - fetched_at < ttl:
+                return cached
+        return None
+
+
+    def _fetch_robots_parser(self, domain: str) -> Optional[RobotFileParser]:
+        """Download and parse robots.txt for a domain, caching the result"""
         try:
             # Build robots.txt URL
-            parsed_start = urlparse(self.start_url)
+            parsed_start = _urlparse(self.start_url)
             scheme = parsed_start.scheme or "https"
             robots_url = f"{scheme}://{domain}/robots.txt"
             rp = RobotFileParser()
             rp.set_url(robots_url)
             
-            # Fetch and parse robots.txt
-            response = requests.get(robots_url, timeout=5, headers=self.headers, allow_redirects=True)
-            if response.status_code == 200:
-                rp.parse(response.text.splitlines())
-                self.robots_cache[domain] = rp
+            # Fetch robots.txt, reading at most ROBOTS_MAX_BYTES of the body
+            with self.session.get(robots_url, timeout=5, allow_redirects=True, stream=True) as response:
+                status = response.status_code
+                if status == 200:
+                    body = response.raw.read(self.ROBOTS_MAX_BYTES, decode_content=True)
+                    text = body.decode(response.encoding or 'utf-8', errors='replace')
+            
+            if status == 200:
+                rp.parse(text.splitlines())
+                self.robots_cache[domain] = (rp, time.monotonic())
                 
                 # Extract crawl-delay directive
                 crawl_delay = rp.crawl_delay(self.user_agent)
                 if crawl_delay:
                     self.domain_delays[domain] = float(crawl_delay)
                     self.logger.info(f"Found crawl-delay of {crawl_delay}s for {domain}")
+                else:
+                    self.domain_delays.pop(domain, None)
                 
                 self.logger.info(f"Loaded robots.txt for {domain}")
                 return rp
             else:
-                self.logger.debug(f"No robots.txt found for {domain} (HTTP {response.status_code})")
-                # Cache negative result to avoid repeated requests
-                self.robots_cache[domain] = None
+                self.logger.debug(f"No robots.txt found for {domain} (HTTP {status})")
+                # Cache negative result briefly to avoid repeated requests
+                self.robots_cache[domain] = (None, time.monotonic())
                 return None
                 
         except Exception as e:
             self.logger.debug(f"Error loading robots.txt for {domain}: {e}")
-            self.robots_cache[domain] = None
+            self.robots_cache[domain] = (None, time.monotonic())
             return None
 
 
@@ -111,7 +232,7 @@ class WebScraper:
         if not self.respect_robots:
             return True
         
-        domain = urlparse(url).netloc
+        domain = _urlparse(url).netloc
         rp = self.get_robots_parser(domain)
         
         if rp is None:
@@ -126,11 +247,13 @@ class WebScraper:
 
     def get_crawl_delay(self, url: str) -> float:
         """Get appropriate delay for this domain"""
-        domain = urlparse(url).netloc
+        domain = _urlparse(url).netloc
         
-        # Use domain-specific delay from robots.txt if available
-        if domain in self.domain_delays:
-            return max(self.delay, self.domain_delays[domain])
+        # Use domain-specific delay from robots.txt if available; read it once,
+        # since a worker refreshing robots.txt may remove it concurrently
+        domain_delay = self.domain_delays.get(domain)
+        if domain_delay is not None:
+            return max(self.delay, domain_delay)
         
         return self.delay
 
@@ -142,51 +265,55 @@ class WebScraper:
             return False
         
         # Apply exclude patterns
-        if self.exclude_patterns:
-            for pattern in self.exclude_patterns:
-                if pattern.search(url):
-                    self.logger.debug(f"URL excluded by pattern: {url}")
-                    return False
+        if any(pattern.search(url) for pattern in self.exclude_patterns):
+            self.logger.debug(f"URL excluded by pattern: {url}")
+            return False
         
         # Apply include patterns (if specified)
         if self.include_patterns:
-            for pattern in self.include_patterns:
-                if pattern.search(url):
-                    return True
-            return False
+            return any(pattern.search(url) for pattern in self.include_patterns)
         
         return True
 
 
-    def is_same_domain(self, url: str) -> bool:
-        """Check domain restrictions and external link limits"""
-        domain = urlparse(url).netloc
+    def _domain_allowed(self, domain: str) -> bool:
+        """Check domain restrictions without registering new external domains"""
+        if domain in self.current_domains:
+            return True
         
-        if domain == self.start_domain:
+        return self.allow_exit and self.max_external_hops < self.external_links_depth
+
+
+    def _maybe_register_external(self, domain: str) -> bool:
+        """Register a newly accepted external domain, enforcing the external link limit"""
+        if domain in self.current_domains:
             return True
         
-        if self.allow_exit:
-            if domain not in self.current_domains:
-                # Check if we can add another external domain
-                if self.max_external_hops < self.external_links_depth:
-                    self.max_external_hops += 1
-                    self.current_domains.add(domain)
-                    self.logger.info(f"Following to external domain: {domain} ({self.max_external_hops}/{self.external_links_depth})")
-                    return True
-                else:
-                    self.logger.debug(f"Max external hops reached, skipping: {domain}")
-                    return False
+        if not self.allow_exit:
+            return False
+        
+        # Check if we can add another external domain
+        if self.max_external_hops < self.external_links_depth:
+            self.max_external_hops += 1
+            self.current_domains = self.current_domains | {domain}
+            self.logger.info(f"Following to external domain: {domain} ({self.max_external_hops}/{self.external_links_depth})")
             return True
         
+        self.logger.debug(f"Max external hops reached, skipping: {domain}")
         return False
 
 
-    def extract_data(self, soup: BeautifulSoup, url: str) -> Dict:
-        """Extract structured data from HTML page"""
+    def extract_data(self, tree: LexborHTMLParser, url: str,
+                     collect_links: bool = True) -> Tuple[Dict, List[str]]:
+        """Extract structured data and crawlable links from HTML page"""
+        # Drop script and style contents so text() only measures visible page text
+        tree.strip_tags(['script', 'style'])
+        
+        title = tree.css_first('title')
         data = {
             'url': url,
-            'domain': urlparse(url).netloc,
-            'title': soup.title.string.strip() if soup.title and soup.title.string else '',
+            'domain': _urlparse(url).netloc,
+            'title': title.text().strip() if title else '',
             'meta_description': '',
             'meta_keywords': '',
             'headings': {
@@ -196,137 +323,180 @@ class WebScraper:
             },
             'links': [],
             'images': [],
-            'text_length': len(soup.get_text().strip()),
+            'text_length': len(tree.root.text().strip()) if tree.root else 0,
             'status_code': None,  # Set by scrape_url
-            'timestamp': time.strftime('%Y-%m-%d %H:%M:%S')
+            'timestamp': int(time.time())  # Formatted when results are saved
         }
         
         # Extract meta tags
-        meta_desc = soup.find('meta', attrs={'name': 'description'})
+        meta_desc = tree.css_first('meta[name="description"]')
         if meta_desc:
-            data['meta_description'] = meta_desc.get('content', '').strip()
+            data['meta_description'] = (meta_desc.attributes.get('content') or '').strip()
         
-        meta_keywords = soup.find('meta', attrs={'name': 'keywords'})
+        meta_keywords = tree.css_first('meta[name="keywords"]')
         if meta_keywords:
-            data['meta_keywords'] = meta_keywords.get('content', '').strip()
+            data['meta_keywords'] = (meta_keywords.attributes.get('content') or '').strip()
         
         # Extract headings (up to 5 of each type)
         for level in ['h1', 'h2', 'h3']:
-            headings = soup.find_all(level)
-            data['headings'][level] = [h.get_text().strip() for h in headings[:5] if h.get_text().strip()]
+            headings = tree.css(level)
+            data['headings'][level] = [h.text().strip() for h in headings[:5] if h.text().strip()]
         
         # Extract internal links only
-        links = soup.find_all('a', href=True)
+        links = tree.css('a[href]')
         for link in links[:50]:
-            absolute_url = urljoin(url, link['href'])
-            if self.is_same_domain(absolute_url):
+            absolute_url = urljoin(url, link.attributes['href'] or '')
+            if self._domain_allowed(_urlparse(absolute_url).netloc):
                 data['links'].append(absolute_url)
         
         # Extract images with alt text
-        images = soup.find_all('img', src=True)
+        images = tree.css('img[src]')
         for img in images[:20]:
             img_data = {
-                'src': urljoin(url, img['src']),
-                'alt': img.get('alt', '').strip()
+                'src': urljoin(url, img.attributes['src'] or ''),
+                'alt': (img.attributes.get('alt') or '').strip()
             }
             data['images'].append(img_data)
         
-        return data
+        # Collect filtered, deduplicated links for crawling
+        crawl_links = []
+        if collect_links:
+            seen = {url}  # Skip self-links
+            for link in links:
+                absolute_url = urljoin(url, link.attributes['href'] or '')
+                # Clean URL (remove fragments and query params for deduplication)
+                clean_url = absolute_url.split('#', 1)[0].split('?', 1)[0]
+                
+                if not clean_url or clean_url in seen:
+                    continue
+                seen.add(clean_url)
+                
+                if self._domain_allowed(_urlparse(clean_url).netloc) and self.is_valid_url(clean_url):
+                    crawl_links.append(clean_url)
+        
+        return data, crawl_links
 
 
-    def scrape_url(self, url: str) -> Optional[Dict]:
-        """Scrape single URL and return extracted data"""
+    def scrape_url(self, url: str, collect_links: bool = True) -> Tuple[Optional[Dict], List[str], Optional[int]]:
+        """Scrape single URL and return extracted data, links to crawl and the HTTP status"""
         try:
             self.logger.info(f"Scraping: {url}")
-            response = requests.get(url, headers=self.headers, timeout=15, allow_redirects=True)
-            
-            # Handle rate limiting
-            if response.status_code == 429:
-                self.logger.warning(f"Rate limited on {url}, waiting extra time...")
-                time.sleep(self.delay * 3)
-                return None
-            
-            response.raise_for_status()
+            # Stream the response so headers can be checked before downloading the body
+            with self.session.get(url, timeout=15, allow_redirects=True, stream=True,
+                                  headers=self.PAGE_HEADERS) as response:
+                # Report rate limiting so crawl() can back off the whole domain
+                if response.status_code == 429:
+                    self.logger.warning(f"Rate limited on {url}, backing off the domain...")
+                    return None, [], response.status_code
+                
+                response.raise_for_status()
+                
+                # Verify HTML content
+                content_type = response.headers.get('content-type', '').lower()
+                if ('text/html' not in content_type) and ('application/xhtml+xml' not in content_type):
+                    self.logger.debug(f"Skipping non-HTML content: {url} ({content_type})")
+                    return None, [], response.status_code
+                
+                # Skip oversized pages, trusting Content-Length when present
+                content_length = response.headers.get('content-length', '')
+                if content_length.isdigit() and int(content_length) > self.MAX_PAGE_BYTES:
+                    self.logger.debug(f"Skipping oversized page: {url} ({content_length} bytes)")
+                    return None, [], response.status_code
+                
+                content = response.raw.read(self.MAX_PAGE_BYTES + 1, decode_content=True)
+                if len(content) > self.MAX_PAGE_BYTES:
+                    self.logger.debug(f"Skipping oversized page: {url} (over {self.MAX_PAGE_BYTES} bytes)")
+                    return None, [], response.status_code
             
-            # Verify HTML content
-            content_type = response.headers.get('content-type', '').lower()
-            if ('text/html' not in content_type) and ('application/xhtml+xml' not in content_type):
-                self.logger.debug(f"Skipping non-HTML content: {url} ({content_type})")
-                return None
+            # Decode with the charset from Content-Type; without a usable one, Lexbor
+            # detects it from a BOM or <meta charset> as the HTML standard specifies
+            charset = _CHARSET_RE.search(content_type)
+            detect_encoding = charset is None
+            if charset and charset.group(1).lower() not in ('utf-8', 'utf8'):
+                try:
+                    content = content.decode(charset.group(1), errors='replace')
+                except LookupError:
+                    self.logger.debug(f"Unknown charset {charset.group(1)} for {url}, detecting from content")
+                    detect_encoding = True
             
-            soup = BeautifulSoup(response.content, 'html.parser')
-            data = self.extract_data(soup, url)
+            tree = LexborHTMLParser(content, encoding=detect_encoding)
+            data, links = self.extract_data(tree, url, collect_links)
             data['status_code'] = response.status_code
             
-            return data
+            return data, links, response.status_code
             
         except requests.exceptions.Timeout:
             self.logger.warning(f"Timeout scraping {url}")
-            return None
+            return None, [], None
         except requests.exceptions.ConnectionError:
             self.logger.warning(f"Connection error for {url}")
-            return None
+            return None, [], None
         except requests.RequestException as e:
             self.logger.error(f"Error scraping {url}: {e}")
-            return None
+            return None, [], None
         except Exception as e:
             self.logger.error(f"Unexpected error scraping {url}: {e}")
-            return None
-
-
-    def get_links_from_page(self, url: str) -> List[str]:
-        """Extract and filter links from a page for crawling"""
-        try:
-            response = requests.get(url, headers=self.headers, timeout=10)
-            response.raise_for_status()
-            
-            # Check content type
-            content_type = response.headers.get('content-type', '').lower()
-            if ('text/html' not in content_type) and ('application/xhtml+xml' not in content_type):
-                return []
-            
-            soup = BeautifulSoup(response.content, 'html.parser')
-            links = []
-            
-            for link in soup.find_all('a', href=True):
-                absolute_url = urljoin(url, link['href'])
-                # Clean URL (remove fragments and query params for deduplication)
-                parsed = urlparse(absolute_url)
-                clean_url = urlunparse(parsed._replace(fragment='', query=''))
-                
-                if (clean_url and 
-                    clean_url != url and  # Skip self-links
-                    self.is_valid_url(clean_url) and
-                    self.is_same_domain(clean_url)):
-                    links.append(clean_url)
-            
-            # Deduplicate while preserving order
-            seen = set()
-            unique_links = []
-            for link in links:
-                if link not in seen:
-                    seen.add(link)
-                    unique_links.append(link)
-            
-            return unique_links
-            
-        except requests.RequestException as e:
-            self.logger.error(f"Error getting links from {url}: {e}")
-            return []
+            return None, [], None
+
+
+    def _record(self, data: Dict):
+        """Store scraped page data and append its flattened fields to the columns"""
+        self.scraped_data.append(data)
+        
+        # Stream the page as an NDJSON line so partial crawls are kept on disk
+        if self._stream:
+            self._stream.write(orjson.dumps(_exported(data)) + b"\n")
+            self._stream.flush()
+        
+        self._append_row(self._columns, data)
+
+
+    def _synced_columns(self) -> Dict[str, List]:
+        """Flattened columns, rebuilt from scraped_data if it was changed outside _record()"""
+        if len(self._columns['url']) != len(self.scraped_data):
+            self._columns = {field: [] for field in self.CSV_FIELDS}
+            for data in self.scraped_data:
+                self._append_row(self._columns, data)
+        
+        return self._columns
+
+
+    @staticmethod
+    def _append_row(columns: Dict[str, List], data: Dict):
+        """Append the flattened fields of one page to the columns"""
+        headings = data['headings']
+        row = (
+            data['url'],
+            data['domain'],
+            data['title'],
+            data['meta_description'],
+            data['meta_keywords'],
+            data['text_length'],
+            data.get('status_code', ''),
+            data['timestamp'],
+            len(data['links']),
+            len(data['images']),
+            len(headings['h1']),
+            len(headings['h2']),
+            len(headings['h3']),
+            ' | '.join(headings['h1'][:3]),  # First 3 h1s
+        )
+        for column, value in zip(columns.values(), row):
+            column.append(value)
 
 
     def crawl(self):
-        """Main BFS crawling loop"""
+        """Main BFS crawling loop, fetching pages on a worker pool"""
         try:
             # Test start URL accessibility
             self.logger.info(f"Testing accessibility of start URL: {self.start_url}")
             try:
-                test_response = requests.head(self.start_url, headers=self.headers, timeout=10, allow_redirects=True)
+                test_response = self.session.head(self.start_url, timeout=10, allow_redirects=True)
                 status = test_response.status_code
                 if status >= 400 or status == 405:
                     raise Exception("HEAD not reliable")
             except Exception:
-                r = requests.get(self.start_url, headers=self.headers, timeout=10, stream=True, allow_redirects=True)
+                r = self.session.get(self.start_url, timeout=10, stream=True, allow_redirects=True)
                 status = r.status_code
                 r.close()
             self.logger.info(f"Start URL returned status: {status}")
@@ -341,60 +511,108 @@ class WebScraper:
         except Exception as e:
             self.logger.warning(f"Could not test start URL accessibility: {e}")
         
-        queue = deque([(self.start_url, 0)])  # (url, depth)
-        last_request_time = {}  # Per-domain rate limiting
+        # Per-domain FIFO queues of (url, depth), scheduled through a min-heap of
+        # (next_allowed_time, domain) holding every domain with queued URLs
+        domain_queues = {self.start_domain: deque([(self.start_url, 0)])}
+        ready = [(0.0, self.start_domain)]
+        next_allowed = {}  # Per-domain monotonic time of the next permitted request
+        pending = {}  # future -> (url, depth)
         
         self.logger.info(f"Starting crawl from: {self.start_url}")
         self.logger.info(f"Robots.txt compliance: {'Enabled' if self.respect_robots else 'Disabled'}")
         
-        while queue:
-            current_url, depth = queue.popleft()
-            
-            # Skip already visited URLs
-            if current_url in self.visited_urls:
-                continue
-            
-            # Check depth limit
-            if depth > self.max_depth:
-                self.logger.debug(f"Max depth reached for: {current_url}")
-                continue
-            
-            # Check domain restrictions
-            if not self.is_same_domain(current_url):
-                continue
-            
-            self.visited_urls.add(current_url)
-            
-            # Per-domain rate limiting
-            domain = urlparse(current_url).netloc
-            crawl_delay = self.get_crawl_delay(current_url)
-            
-            if domain in last_request_time:
-                time_since_last = time.time() - last_request_time[domain]
-                if time_since_last < crawl_delay:
-                    sleep_time = crawl_delay - time_since_last
-                    self.logger.debug(f"Rate limiting: sleeping {sleep_time:.2f}s for {domain}")
-                    time.sleep(sleep_time)
-            
-            last_request_time[domain] = time.time()
-            
-            # Scrape the current page
-            data = self.scrape_url(current_url)
-            if data:
-                self.scraped_data.append(data)
-                
-                # Get links for next depth level
-                if depth < self.max_depth:
-                    links = self.get_links_from_page(current_url)
-                    self.logger.debug(f"Found {len(links)} valid links on {current_url}")
+        stream = open(self.stream_file, 'wb') if self.stream_file else nullcontext()
+        executor = ThreadPoolExecutor(max_workers=self.max_workers)
+        try:
+            with stream as self._stream:
+                while ready or pending:
+                    # Dispatch from domains whose crawl delay has elapsed while workers are available
+                    while ready and len(pending) < self.max_workers:
+                        allowed_at, domain = ready[0]
+                        now = time.monotonic()
+                        if allowed_at > now:
+                            break
+                        heapq.heappop(ready)
+                        
+                        # A 429 may have pushed the domain back after it was scheduled
+                        if next_allowed.get(domain, 0.0) > allowed_at:
+                            heapq.heappush(ready, (next_allowed[domain], domain))
+                            continue
+                        
+                        # Links are only queued below max_depth, so no depth check is needed here
+                        current_url, depth = domain_queues[domain].popleft()
+                        self.visited_urls.add(current_url)
+                        next_allowed[domain] = now + self.get_crawl_delay(current_url)
+                        
+                        # Scrape the page in a worker, collecting links for the next depth level
+                        future = executor.submit(self.scrape_url, current_url, depth < self.max_depth)
+                        pending[future] = (current_url, depth)
+                        
+                        # Reschedule the domain for its next permitted request
+                        if domain_queues[domain]:
+                            heapq.heappush(ready, (next_allowed.get(domain, 0.0), domain))
+                        else:
+                            del domain_queues[domain]
                     
-                    for link in links:
-                        if link not in self.visited_urls:
-                            queue.append((link, depth + 1))
-            
-            # Progress updates
-            if len(self.scraped_data) % 10 == 0 and len(self.scraped_data) > 0:
-                self.logger.info(f"Progress: {len(self.scraped_data)} pages scraped, {len(queue)} in queue")
+                    # Wait for a worker to finish or for the next domain to become ready
+                    if ready and len(pending) < self.max_workers:
+                        timeout = max(0.0, ready[0][0] - time.monotonic())
+                        if timeout:
+                            self.logger.debug(f"Rate limiting: next request to {ready[0][1]} in {timeout:.2f}s")
+                    else:
+                        timeout = None
+                    
+                    if not pending:
+                        time.sleep(timeout)
+                        continue
+                    
+                    done, _ = wait(pending, timeout=timeout, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        current_url, depth = pending.pop(future)
+                        data, links, status = future.result()
+                        
+                        # Back off the rate-limiting domain rather than just this worker
+                        if status == 429:
+                            domain = _urlparse(current_url).netloc
+                            next_allowed[domain] = max(next_allowed.get(domain, 0.0),
+                                                       time.monotonic() + self.delay * 3)
+                        
+                        if not data:
+                            continue
+                        
+                        self._record(data)
+                        
+                        if depth < self.max_depth:
+                            self.logger.debug(f"Found {len(links)} valid links on {current_url}")
+                            
+                            for link in links:
+                                if link in self._enqueued:
+                                    continue
+                                self._enqueued.add(link)
+                                
+                                # Domain restrictions were checked during harvesting;
+                                # external domains are registered once, here
+                                link_domain = _urlparse(link).netloc
+                                if not self._maybe_register_external(link_domain):
+                                    continue
+                                
+                                if link_domain not in domain_queues:
+                                    domain_queues[link_domain] = deque()
+                                    heapq.heappush(ready, (next_allowed.get(link_domain, 0.0), link_domain))
+                                domain_queues[link_domain].append((link, depth + 1))
+                        
+                        # Progress updates
+                        if len(self.scraped_data) % 10 == 0:
+                            queued = sum(len(q) for q in domain_queues.values())
+                            self.logger.info(f"Progress: {len(self.scraped_data)} pages scraped, {queued} in queue")
+        except BaseException:
+            # Don't wait for in-flight requests on Ctrl-C or errors; let main() react promptly
+            executor.shutdown(wait=False, cancel_futures=True)
+            raise
+        finally:
+            # The stream file is closed now; later _record() calls must not write to it
+            self._stream = None
+        executor.shutdown()
         
         self.logger.info(f"Crawling complete. Scraped {len(self.scraped_data)} pages from {len(self.visited_urls)} URLs")
 
@@ -413,40 +631,30 @@ class WebScraper:
                 fmt = output_format or self.output_format
                 
                 if fmt == 'json':
-                    with open(output_file, 'w', encoding='utf-8') as f:
-                        json.dump(self.scraped_data, f, indent=2, ensure_ascii=False)
+                    with open(output_file, 'wb') as f:
+                        f.write(orjson.dumps([_exported(item) for item in self.scraped_data],
+                                             option=orjson.OPT_INDENT_2))
                     self.logger.info(f"Successfully saved JSON data to {output_file}")
                 
-                elif fmt == 'csv':
-                    # Flatten nested data for CSV format
-                    flattened_data = []
-                    for item in self.scraped_data:
-                        flat_item = {
-                            'url': item['url'],
-                            'domain': item['domain'],
-                            'title': item['title'],
-                            'meta_description': item['meta_description'],
-                            'meta_keywords': item['meta_keywords'],
-                            'text_length': item['text_length'],
-                            'status_code': item.get('status_code', ''),
-                            'timestamp': item['timestamp'],
-                            'num_links': len(item['links']),
-                            'num_images': len(item['images']),
-                            'h1_count': len(item['headings']['h1']),
-                            'h2_count': len(item['headings']['h2']),
-                            'h3_count': len(item['headings']['h3']),
-                            'h1_text': ' | '.join(item['headings']['h1'][:3]),  # First 3 h1s
-                        }
-                        flattened_data.append(flat_item)
+                elif fmt == 'ndjson':
+                    if output_file == self.stream_file:
+                        self.logger.info(f"NDJSON data already streamed to {output_file}")
+                        return
                     
-                    if flattened_data:
-                        with open(output_file, 'w', newline='', encoding='utf-8') as f:
-                            writer = csv.DictWriter(f, fieldnames=flattened_data[0].keys())
-                            writer.writeheader()
-                            writer.writerows(flattened_data)
-                        self.logger.info(f"Successfully saved CSV data to {output_file}")
-                    else:
-                        self.logger.warning("No flattened data to save to CSV")
+                    with open(output_file, 'wb') as f:
+                        for item in self.scraped_data:
+                            f.write(orjson.dumps(_exported(item)) + b"\n")
+                    self.logger.info(f"Successfully saved NDJSON data to {output_file}")
+                
+                elif fmt == 'csv':
+                    # Write the flattened columns row by row, formatting timestamps on the way
+                    columns = [map(_format_timestamp, values) if field == 'timestamp' else values
+                               for field, values in self._synced_columns().items()]
+                    with open(output_file, 'w', newline='', encoding='utf-8') as f:
+                        writer = csv.writer(f)
+                        writer.writerow(self.CSV_FIELDS)
+                        writer.writerows(zip(*columns))
+                    self.logger.info(f"Successfully saved CSV data to {output_file}")
                 
                 else:  # 'print' format with output file
                     # Save as plain text
@@ -464,7 +672,11 @@ class WebScraper:
             else:
                 # Output to stdout
                 if self.output_format == 'json':
-                    print(json.dumps(self.scraped_data, indent=2, ensure_ascii=False))
+                    print(orjson.dumps([_exported(item) for item in self.scraped_data],
+                                       option=orjson.OPT_INDENT_2).decode())
+                elif self.output_format == 'ndjson':
+                    for item in self.scraped_data:
+                        print(orjson.dumps(_exported(item)).decode())
                 else:
                     for item in self.scraped_data:
                         print(f"\nURL: {item['url']}")
@@ -485,9 +697,10 @@ class WebScraper:
         if not self.scraped_data:
             return
         
-        domains_scraped = set(item['domain'] for item in self.scraped_data)
-        total_links = sum(len(item['links']) for item in self.scraped_data)
-        total_images = sum(len(item['images']) for item in self.scraped_data)
+        columns = self._synced_columns()
+        domains_scraped = set(columns['domain'])
+        total_links = sum(columns['num_links'])
+        total_images = sum(columns['num_images'])
         
         print(f"\n{'='*50}")
         print("CRAWL SUMMARY")
@@ -523,6 +736,8 @@ def main():
                        help='Maximum crawl depth (default: 3)')
     parser.add_argument('--delay', type=float, default=1.0,
                        help='Minimum delay between requests in seconds (default: 1.0)')
+    parser.add_argument('--workers', type=int, default=16,
+                       help='Number of pages fetched concurrently (default: 16)')
     
     # Robots.txt compliance
     parser.add_argument('--no-robots', action='store_true',
@@ -531,9 +746,10 @@ def main():
                        help='User-agent name for robots.txt compliance (default: *)')
     
     # Output configuration
-    parser.add_argument('--output', '-o', help='Output file path', default='output.json')
-    parser.add_argument('--format', choices=['json', 'csv', 'print'], default='json',
-                       help='Output format (default: json)')
+    parser.add_argument('--output', '-o',
+                       help='Output file path (default: output.<format>, e.g. output.json)')
+    parser.add_argument('--format', choices=['json', 'ndjson', 'csv', 'print'], default='json',
+                       help='Output format (default: json); ndjson is written as pages are scraped')
     
     # URL filtering
     parser.add_argument('--exclude', nargs='*', default=[],
@@ -552,8 +768,16 @@ def main():
     if args.external_links_depth > 0 and not args.allow_exit:
         parser.error("--external-links-depth requires --allow-exit to be set")
 
+    if args.depth < 0:
+        parser.error("--depth must be at least 0")
+
+    if args.workers < 1:
+        parser.error("--workers must be at least 1")
+
     if args.format == "print":
         args.output = None
+    elif args.output is None:
+        args.output = f"output.{args.format}"
     
     # Setup custom headers
     headers = None
@@ -562,7 +786,12 @@ def main():
     
     # Convert wildcard patterns to regex
     def wildcard_to_regex(p): 
-        return re.compile(fnmatch.translate(p), re.IGNORECASE)
+        regex = fnmatch.translate(p)
+        # A leading '*' matches from the start anyway, so anchor it to stop
+        # search() from retrying the whole pattern at every offset of a URL
+        if p.startswith('*'):
+            regex = r'\A' + regex
+        return re.compile(regex, re.IGNORECASE)
     exclude_patterns = [wildcard_to_regex(p) for p in args.exclude]
     include_patterns = [wildcard_to_regex(p) for p in args.include]
     
@@ -579,7 +808,9 @@ def main():
         exclude_patterns=exclude_patterns,
         include_patterns=include_patterns,
         respect_robots=not args.no_robots,
-        user_agent=args.bot_name
+        user_agent=args.bot_name,
+        max_workers=args.workers,
+        stream_file=args.output if args.format == 'ndjson' else None
     )
     
     try:
@@ -603,7 +834,9 @@ def main():
         
     except KeyboardInterrupt:
         print("\nCrawling interrupted by user")
-        if scraper.scraped_data:
+        if scraper.scraped_data and scraper.stream_file:
+            print(f"Partial results: {len(scraper.scraped_data)} pages already saved to {scraper.stream_file}")
+        elif scraper.scraped_data:
             print(f"Partial results: {len(scraper.scraped_data)} pages scraped")
             save = input("Save partial results? (y/n): ").strip().lower()
             if save == 'y':
@@ -612,9 +845,9 @@ def main():
                 if not filename:
                     filename = args.output or f"partial-{int(time.time())}.json"
 
-                fmt = input(f"File format [json/csv] (default: {args.format}): ").strip().lower()
-                if fmt not in ("json", "csv"):
-                    fmt = args.format if args.format in ("json", "csv") else "json"
+                fmt = input(f"File format [json/ndjson/csv] (default: {args.format}): ").strip().lower()
+                if fmt not in ("json", "ndjson", "csv"):
+                    fmt = args.format if args.format in ("json", "ndjson", "csv") else "json"
 
                 args.output, args.format = filename, fmt
                 scraper.save_results(args.output, args.format)